@@ -1,17 +1,27 @@
 
 
+import os
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 import torchvision
 import torchvision.transforms as transforms
+from torch.utils.checkpoint import checkpoint
 from torch.utils.data import DataLoader
 from tqdm.notebook import tqdm
-from torch.cuda.amp import GradScaler, autocast
 
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"Using device: {DEVICE}")
+# BF16 keeps the FP32 exponent range, so loss scaling is only needed on the FP16 fallback.
+# Native BF16 tensor cores need Ampere (sm80)+; is_bf16_supported() also reports emulated BF16 on e.g. T4.
+AMP_DTYPE = torch.bfloat16 if torch.cuda.is_available() and torch.cuda.get_device_capability() >= (8, 0) else torch.float16
+# Input shapes are fixed, so autotune the cuDNN conv once; let leftover FP32 matmuls use TF32
+torch.backends.cudnn.benchmark = True
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+torch.set_float32_matmul_precision('high')
 IMG_SIZE = 32       # Input image size (CIFAR-10 default)
 PATCH_SIZE = 4      # Patch size (Image size must be divisible by patch size)
 NUM_CLASSES = 10    # Number of classes for CIFAR-10
@@ -25,7 +35,10 @@ EMB_DROPOUT = 0.1   # Embedding dropout rate
 
 LEARNING_RATE = 1e-4
 BATCH_SIZE = 128
+USE_CHECKPOINT = False  # Recompute block activations in backward; enable to fit a larger BATCH_SIZE
 EPOCHS = 10
+LOG_INTERVAL = 50   # Steps between progress-bar refreshes (each one syncs with the GPU)
+NUM_WORKERS = min(8, os.cpu_count() or 1)
 
 
 
@@ -43,7 +56,7 @@ class FeedForward(nn.Module):
         super().__init__()
         self.net = nn.Sequential(
             nn.Linear(dim, hidden_dim),
-            nn.GELU(),
+            nn.GELU(approximate='tanh'),
             nn.Dropout(dropout),
             nn.Linear(hidden_dim, dim),
             nn.Dropout(dropout)
@@ -56,7 +69,7 @@ class Attention(nn.Module):
     def __init__(self, dim, heads = 8, dropout = 0.):
         super().__init__()
         self.heads = heads
-        self.scale = (dim // heads) ** -0.5
+        self.dim_head = dim // heads
 
         self.to_qkv = nn.Linear(dim, dim * 3, bias = False)
         self.to_out = nn.Sequential(
@@ -66,34 +79,43 @@ class Attention(nn.Module):
 
     def forward(self, x):
         b, n, _, h = *x.shape, self.heads
-        qkv = self.to_qkv(x).chunk(3, dim = -1)
-        q, k, v = map(lambda t: t.reshape(b, n, h, -1).transpose(1, 2), qkv)
+        # 2D input keeps the packed (3*dim, dim) projection on the single-GEMM addmm path
+        qkv = self.to_qkv(x.reshape(b * n, -1))
+        qkv = qkv.view(b, n, 3, h, self.dim_head).permute(2, 0, 3, 1, 4).contiguous()
+        q, k, v = qkv.unbind(0)
 
-        dots = torch.einsum('bhid,bhjd->bhij', q, k) * self.scale
-        attn = dots.softmax(dim=-1)
-
-        out = torch.einsum('bhij,bhjd->bhid', attn, v)
+        # No dropout on the attention weights; `dropout` only applies in to_out
+        out = F.scaled_dot_product_attention(q, k, v, dropout_p=0.0, is_causal=False)
         out = out.transpose(1, 2).reshape(b, n, -1)
         return self.to_out(out)
 
+class Block(nn.Module):
+    def __init__(self, dim, heads, mlp_dim, dropout = 0.):
+        super().__init__()
+        self.attn = PreNorm(dim, Attention(dim, heads = heads, dropout = dropout))
+        self.ff = PreNorm(dim, FeedForward(dim, mlp_dim, dropout = dropout))
+
+    def forward(self, x):
+        x = self.attn(x) + x
+        return self.ff(x) + x
+
 class Transformer(nn.Module):
-    def __init__(self, dim, depth, heads, mlp_dim, dropout = 0.):
+    def __init__(self, dim, depth, heads, mlp_dim, dropout = 0., use_checkpoint = False):
         super().__init__()
-        self.layers = nn.ModuleList([])
-        for _ in range(depth):
-            self.layers.append(nn.ModuleList([
-                PreNorm(dim, Attention(dim, heads = heads, dropout = dropout)),
-                PreNorm(dim, FeedForward(dim, mlp_dim, dropout = dropout))
-            ]))
+        self.layers = nn.Sequential(*[Block(dim, heads, mlp_dim, dropout = dropout) for _ in range(depth)])
+        # Trades a recomputed forward per block for activation memory; only worth it alongside a larger BATCH_SIZE
+        self.use_checkpoint = use_checkpoint
+
     def forward(self, x):
-        for attn, ff in self.layers:
-            x = attn(x) + x
-            x = ff(x) + x
-        return x
+        if self.training and self.use_checkpoint:
+            for blk in self.layers:
+                x = checkpoint(blk, x, use_reentrant=False)
+            return x
+        return self.layers(x)
 
 # ViT Model
 class ViT(nn.Module):
-    def __init__(self, *, image_size, patch_size, num_classes, dim, depth, heads, mlp_dim, channels = 3, dropout = 0., emb_dropout = 0.):
+    def __init__(self, *, image_size, patch_size, num_classes, dim, depth, heads, mlp_dim, channels = 3, dropout = 0., emb_dropout = 0., use_checkpoint = False):
         super().__init__()
         assert image_size % patch_size == 0, 'Image dimensions must be divisible by the patch size.'
         num_patches = (image_size // patch_size) ** 2
@@ -110,7 +132,7 @@ class ViT(nn.Module):
         self.cls_token = nn.Parameter(torch.randn(1, 1, dim))
         self.dropout = nn.Dropout(emb_dropout)
 
-        self.transformer = Transformer(dim, depth, heads, mlp_dim, dropout)
+        self.transformer = Transformer(dim, depth, heads, mlp_dim, dropout, use_checkpoint = use_checkpoint)
 
         self.to_latent = nn.Identity()
         self.mlp_head = nn.Sequential(
@@ -125,11 +147,9 @@ class ViT(nn.Module):
         x = x.flatten(2)
         x = x.transpose(1, 2)
 
+        # Single out-of-place expression so Inductor fuses concat + positional add + dropout
         cls_tokens = self.cls_token.expand(b, -1, -1)
-        x = torch.cat((cls_tokens, x), dim=1)
-
-        x += self.pos_embedding
-        x = self.dropout(x)
+        x = self.dropout(torch.cat((cls_tokens, x), dim=1) + self.pos_embedding)
 
         x = self.transformer(x)
 
@@ -138,26 +158,62 @@ class ViT(nn.Module):
         return self.mlp_head(x)
 
 
-print("Loading CIFAR-10 dataset...")
-transform_train = transforms.Compose([
-    transforms.Resize((IMG_SIZE, IMG_SIZE)),
-    transforms.RandomCrop(IMG_SIZE, padding=4),
-    transforms.RandomHorizontalFlip(),
-    transforms.ToTensor(),
-    transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010)),
-])
+CIFAR_MEAN = (0.4914, 0.4822, 0.4465)
+CIFAR_STD = (0.2023, 0.1994, 0.2010)
+
+class CachedCIFAR10Loader:
+    # Copies the dataset's in-memory uint8 NHWC array to the device once, then
+    # applies RandomCrop(padding) + RandomHorizontalFlip + Normalize per batch with tensor ops
+    def __init__(self, dataset, batch_size, padding = 4, drop_last = True):
+        self.images = torch.from_numpy(dataset.data).to(DEVICE)
+        self.labels = torch.tensor(dataset.targets, device=DEVICE)
+        self.batch_size = batch_size
+        self.padding = padding
+        self.drop_last = drop_last
+        self.mean = torch.tensor(CIFAR_MEAN, device=DEVICE).view(1, 3, 1, 1)
+        self.std = torch.tensor(CIFAR_STD, device=DEVICE).view(1, 3, 1, 1)
+
+    def __len__(self):
+        n = len(self.labels)
+        return n // self.batch_size if self.drop_last else (n + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        perm = torch.randperm(len(self.labels), device=DEVICE)
+        for i in range(len(self)):
+            idx = perm[i * self.batch_size:(i + 1) * self.batch_size]
+            yield self.augment(self.images[idx]), self.labels[idx]
+
+    def augment(self, images):
+        b, h, w, _ = images.shape
+        p = self.padding
+        padded = F.pad(images, (0, 0, p, p, p, p))
+
+        # One gather does the crop and the flip: pick shifted (and optionally reversed) rows/cols
+        rows = torch.randint(0, 2 * p + 1, (b, 1), device=DEVICE) + torch.arange(h, device=DEVICE)
+        cols = torch.randint(0, 2 * p + 1, (b, 1), device=DEVICE) + torch.arange(w, device=DEVICE)
+        flip = torch.rand(b, 1, device=DEVICE) < 0.5
+        cols = torch.where(flip, cols.flip(1), cols)
+        batch = torch.arange(b, device=DEVICE)[:, None, None]
+        images = padded[batch, rows[:, :, None], cols[:, None, :]]
+
+        # NHWC -> NCHW view, so the batch is already channels_last
+        images = images.permute(0, 3, 1, 2).float().div_(255)
+        return (images - self.mean) / self.std
+
 
+print("Loading CIFAR-10 dataset...")
 transform_test = transforms.Compose([
-    transforms.Resize((IMG_SIZE, IMG_SIZE)),
     transforms.ToTensor(),
-    transforms.Normalize((0.4914, 0.4822, 0.4465), (0.2023, 0.1994, 0.2010)),
+    transforms.Normalize(CIFAR_MEAN, CIFAR_STD),
 ])
 
-trainset = torchvision.datasets.CIFAR10(root='./data', train=True, download=True, transform=transform_train)
-trainloader = DataLoader(trainset, batch_size=BATCH_SIZE, shuffle=True, num_workers=2)
+trainset = torchvision.datasets.CIFAR10(root='./data', train=True, download=True)
+# drop_last keeps every training batch the same shape; only evaluate()'s final partial batch adds a graph
+trainloader = CachedCIFAR10Loader(trainset, batch_size=BATCH_SIZE, drop_last=True)
 
 testset = torchvision.datasets.CIFAR10(root='./data', train=False, download=True, transform=transform_test)
-testloader = DataLoader(testset, batch_size=BATCH_SIZE, shuffle=False, num_workers=2)
+testloader = DataLoader(testset, batch_size=BATCH_SIZE, shuffle=False, num_workers=NUM_WORKERS,
+                        pin_memory=True, persistent_workers=True, prefetch_factor=4)
 print("Dataset loaded.")
 
 
@@ -170,27 +226,34 @@ model = ViT(
     heads=HEADS,
     mlp_dim=MLP_DIM,
     dropout=DROPOUT,
-    emb_dropout=EMB_DROPOUT
-).to(DEVICE)
+    emb_dropout=EMB_DROPOUT,
+    use_checkpoint=USE_CHECKPOINT
+).to(DEVICE, memory_format=torch.channels_last)  # NHWC lets cuDNN pick the tensor-core patch-embedding conv
+# Inductor fuses the LayerNorm / GELU / dropout / residual elementwise ops into a few kernels.
+# No CUDA graphs: the extra eval-batch shape would otherwise mean another graph capture and autotune pass.
+model = torch.compile(model, mode='max-autotune-no-cudagraphs', fullgraph=True)
 
 criterion = nn.CrossEntropyLoss()
-optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
+# Fused CUDA kernel for the whole optimizer step; multi-tensor foreach path on CPU
+optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE, fused=DEVICE == "cuda", foreach=DEVICE != "cuda")
+scaler = torch.amp.GradScaler('cuda', enabled=AMP_DTYPE == torch.float16)
 
 
 def train_one_epoch(epoch_idx):
     model.train()
-    running_loss = 0.0
-    correct = 0
+    running_loss = torch.zeros((), device=DEVICE)
+    correct = torch.zeros((), dtype=torch.long, device=DEVICE)
     total = 0
     pbar = tqdm(enumerate(trainloader), total=len(trainloader), desc=f"Epoch {epoch_idx+1}/{EPOCHS} [Training]")
 
     for i, data in pbar:
         inputs, labels = data
-        inputs, labels = inputs.to(DEVICE), labels.to(DEVICE)
+        inputs, labels = inputs.to(DEVICE, non_blocking=True), labels.to(DEVICE, non_blocking=True)
+        inputs = inputs.to(memory_format=torch.channels_last)
 
-        optimizer.zero_grad()
+        optimizer.zero_grad(set_to_none=True)
 
-        with autocast():
+        with torch.autocast(device_type='cuda', dtype=AMP_DTYPE):
             outputs = model(inputs)
             loss = criterion(outputs, labels)
 
@@ -198,40 +261,47 @@ def train_one_epoch(epoch_idx):
         scaler.step(optimizer)
         scaler.update()
 
-        running_loss += loss.item()
+        running_loss += loss.detach()
         _, predicted = outputs.max(1)
         total += labels.size(0)
-        correct += predicted.eq(labels).sum().item()
+        correct += predicted.eq(labels).sum()
 
-        pbar.set_postfix({'Loss': running_loss/(i+1), 'Acc': 100.*correct/total})
+        if i % LOG_INTERVAL == 0:
+            pbar.set_postfix({'Loss': running_loss.item()/(i+1), 'Acc': 100.*correct.item()/total})
 
-    return running_loss / len(trainloader), 100. * correct / total
+    epoch_loss, epoch_acc = running_loss.item() / len(trainloader), 100. * correct.item() / total
+    pbar.set_postfix({'Loss': epoch_loss, 'Acc': epoch_acc})
+    return epoch_loss, epoch_acc
 
 
 def evaluate(epoch_idx):
     model.eval()
-    running_loss = 0.0
-    correct = 0
+    running_loss = torch.zeros((), device=DEVICE)
+    correct = torch.zeros((), dtype=torch.long, device=DEVICE)
     total = 0
     pbar = tqdm(enumerate(testloader), total=len(testloader), desc=f"Epoch {epoch_idx+1}/{EPOCHS} [Testing]")
 
-    with torch.no_grad():
+    with torch.inference_mode():
         for i, data in pbar:
             inputs, labels = data
-            inputs, labels = inputs.to(DEVICE), labels.to(DEVICE)
+            inputs, labels = inputs.to(DEVICE, non_blocking=True), labels.to(DEVICE, non_blocking=True)
+            inputs = inputs.to(memory_format=torch.channels_last)
 
-            with autocast():
+            with torch.autocast(device_type='cuda', dtype=AMP_DTYPE):
                outputs = model(inputs)
                loss = criterion(outputs, labels)
 
-            running_loss += loss.item()
+            running_loss += loss.detach()
             _, predicted = outputs.max(1)
             total += labels.size(0)
-            correct += predicted.eq(labels).sum().item()
+            correct += predicted.eq(labels).sum()
 
-            pbar.set_postfix({'Loss': running_loss/(i+1), 'Acc': 100.*correct/total})
+            if i % LOG_INTERVAL == 0:
+                pbar.set_postfix({'Loss': running_loss.item()/(i+1), 'Acc': 100.*correct.item()/total})
 
-    return running_loss / len(testloader), 100. * correct / total
+    epoch_loss, epoch_acc = running_loss.item() / len(testloader), 100. * correct.item() / total
+    pbar.set_postfix({'Loss': epoch_loss, 'Acc': epoch_acc})
+    return epoch_loss, epoch_acc
 
 
 print("Starting training...")
@@ -242,18 +312,26 @@ for epoch in range(EPOCHS):
 
 print('Finished Training')
 
+import os
 import timm
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import torch.optim as optim
 import torchvision
 import torchvision.transforms as transforms
 from torch.utils.data import DataLoader
 from tqdm.notebook import tqdm
-from torch.cuda.amp import GradScaler, autocast
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 print(f"Using device: {DEVICE}")
+# BF16 keeps the FP32 exponent range, so loss scaling is only needed on the FP16 fallback.
+# Native BF16 tensor cores need Ampere (sm80)+; is_bf16_supported() also reports emulated BF16 on e.g. T4.
+AMP_DTYPE = torch.bfloat16 if torch.cuda.is_available() and torch.cuda.get_device_capability() >= (8, 0) else torch.float16
+torch.backends.cudnn.benchmark = True
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+torch.set_float32_matmul_precision('high')
 
 pretrained_imgSize = 224
 numClass = 10
@@ -261,8 +339,10 @@ numClass = 10
 ft_learnRate = 3e-5
 batch_size = 64
 EPOCHS = 5
+LOG_INTERVAL = 50
+NUM_WORKERS = min(8, os.cpu_count() or 1)
 
-scaler = GradScaler()
+scaler = torch.amp.GradScaler('cuda', enabled=AMP_DTYPE == torch.float16)
 
 print("Loading pre-trained model...")
 model = timm.create_model('vit_base_patch16_224.augreg_in21k', pretrained=True, num_classes=0)
@@ -276,41 +356,46 @@ print("Model loaded and head replaced.")
 
 print("Loading CIFAR-10 dataset...")
 
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
+
+# Workers keep CIFAR-10 at 32x32; the upsample to pretrained_imgSize happens batched on the GPU
 transform_train = transforms.Compose([
-    transforms.Resize((pretrained_imgSize, pretrained_imgSize)),
     transforms.RandomHorizontalFlip(),
     transforms.ToTensor(),
-    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+    transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
 ])
 
 transform_test = transforms.Compose([
-    transforms.Resize((pretrained_imgSize, pretrained_imgSize)),
     transforms.ToTensor(),
-    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+    transforms.Normalize(mean=IMAGENET_MEAN, std=IMAGENET_STD),
 ])
 
 trainset = torchvision.datasets.CIFAR10(root='./data', train=True, download=True, transform=transform_train)
-trainloader = DataLoader(trainset, batch_size=batch_size, shuffle=True, num_workers=2)
+trainloader = DataLoader(trainset, batch_size=batch_size, shuffle=True, num_workers=NUM_WORKERS,
+                         pin_memory=True, persistent_workers=True, prefetch_factor=4)
 
 testset = torchvision.datasets.CIFAR10(root='./data', train=False, download=True, transform=transform_test)
-testloader = DataLoader(testset, batch_size=batch_size, shuffle=False, num_workers=2)
+testloader = DataLoader(testset, batch_size=batch_size, shuffle=False, num_workers=NUM_WORKERS,
+                        pin_memory=True, persistent_workers=True, prefetch_factor=4)
 print("Dataset loaded.")
 
 criterion = nn.CrossEntropyLoss()
-optimizer = optim.AdamW(model.parameters(), lr=ft_learnRate, weight_decay=0.01)
+optimizer = optim.AdamW(model.parameters(), lr=ft_learnRate, weight_decay=0.01, fused=DEVICE == "cuda", foreach=DEVICE != "cuda")
 
 def train_one_epoch(epoch_idx):
     model.train()
-    running_loss = 0.0
-    correct = 0
+    running_loss = torch.zeros((), device=DEVICE)
+    correct = torch.zeros((), dtype=torch.long, device=DEVICE)
     total = 0
     pbar = tqdm(enumerate(trainloader), total=len(trainloader), desc=f"Epoch {epoch_idx+1}/{EPOCHS} [Training]")
 
     for i, data in pbar:
         inputs, labels = data
-        inputs, labels = inputs.to(DEVICE), labels.to(DEVICE)
-        optimizer.zero_grad()
-        with autocast():
+        inputs, labels = inputs.to(DEVICE, non_blocking=True), labels.to(DEVICE, non_blocking=True)
+        inputs = F.interpolate(inputs, size=pretrained_imgSize, mode='bilinear', align_corners=False)
+        optimizer.zero_grad(set_to_none=True)
+        with torch.autocast(device_type='cuda', dtype=AMP_DTYPE):
             outputs = model(inputs)
             loss = criterion(outputs, labels)
 
@@ -318,39 +403,46 @@ def train_one_epoch(epoch_idx):
         scaler.step(optimizer)
         scaler.update()
 
-        running_loss += loss.item()
+        running_loss += loss.detach()
         _, predicted = outputs.max(1)
         total += labels.size(0)
-        correct += predicted.eq(labels).sum().item()
+        correct += predicted.eq(labels).sum()
 
-        pbar.set_postfix({'Loss': running_loss/(i+1), 'Acc': f"{100.*correct/total:.2f}%"})
+        if i % LOG_INTERVAL == 0:
+            pbar.set_postfix({'Loss': running_loss.item()/(i+1), 'Acc': f"{100.*correct.item()/total:.2f}%"})
 
-    return running_loss / len(trainloader), 100. * correct / total
+    epoch_loss, epoch_acc = running_loss.item() / len(trainloader), 100. * correct.item() / total
+    pbar.set_postfix({'Loss': epoch_loss, 'Acc': f"{epoch_acc:.2f}%"})
+    return epoch_loss, epoch_acc
 
 def evaluate(epoch_idx):
     model.eval()
-    running_loss = 0.0
-    correct = 0
+    running_loss = torch.zeros((), device=DEVICE)
+    correct = torch.zeros((), dtype=torch.long, device=DEVICE)
     total = 0
     pbar = tqdm(enumerate(testloader), total=len(testloader), desc=f"Epoch {epoch_idx+1}/{EPOCHS} [Testing]")
 
-    with torch.no_grad():
+    with torch.inference_mode():
         for i, data in pbar:
             inputs, labels = data
-            inputs, labels = inputs.to(DEVICE), labels.to(DEVICE)
+            inputs, labels = inputs.to(DEVICE, non_blocking=True), labels.to(DEVICE, non_blocking=True)
+            inputs = F.interpolate(inputs, size=pretrained_imgSize, mode='bilinear', align_corners=False)
 
-            with autocast():
+            with torch.autocast(device_type='cuda', dtype=AMP_DTYPE):
                outputs = model(inputs)
                loss = criterion(outputs, labels)
 
-            running_loss += loss.item()
+            running_loss += loss.detach()
             _, predicted = outputs.max(1)
             total += labels.size(0)
-            correct += predicted.eq(labels).sum().item()
+            correct += predicted.eq(labels).sum()
 
-            pbar.set_postfix({'Loss': running_loss/(i+1), 'Acc': f"{100.*correct/total:.2f}%"}) # Format acc
+            if i % LOG_INTERVAL == 0:
+                pbar.set_postfix({'Loss': running_loss.item()/(i+1), 'Acc': f"{100.*correct.item()/total:.2f}%"}) # Format acc
 
-    return running_loss / len(testloader), 100. * correct / total
+    epoch_loss, epoch_acc = running_loss.item() / len(testloader), 100. * correct.item() / total
+    pbar.set_postfix({'Loss': epoch_loss, 'Acc': f"{epoch_acc:.2f}%"})
+    return epoch_loss, epoch_acc
 
 print("Starting fine-tuning...")
 for epoch in range(EPOCHS):
@@ -370,7 +462,6 @@ model.eval()
 
 import matplotlib.pyplot as plt
 import numpy as np
-import random
 import torch
 # plotting the predictions
 NUM_IMAGES_TO_SHOW = 16
@@ -379,28 +470,22 @@ NUM_COLS = 4
 model.eval()
 classes = testset.classes
 
-transform_display = transforms.Compose([
-    transforms.Resize((PRETRAINED_IMG_SIZE, PRETRAINED_IMG_SIZE)),
-    transforms.ToTensor(),
-])
-
-display_testset = torchvision.datasets.CIFAR10(
-    root='./data', train=False, download=True, transform=transform_display)
-
-all_indices = list(range(len(testset)))
-random_indices = random.sample(all_indices, NUM_IMAGES_TO_SHOW)
-
-images_normalized = torch.stack([testset[i][0] for i in random_indices])
-labels = torch.tensor([testset[i][1] for i in random_indices])
+# The raw uint8 test split is already in memory, so sample straight from it instead of per-image __getitem__
+test_images = torch.from_numpy(testset.data)  # (N, 32, 32, 3)
+test_labels = torch.tensor(testset.targets)
+idx = torch.randperm(len(testset))[:NUM_IMAGES_TO_SHOW]
 
-images_display = torch.stack([display_testset[i][0] for i in random_indices])
+images_display = test_images.index_select(0, idx).to(DEVICE).permute(0, 3, 1, 2).float().div(255)
+labels = test_labels.index_select(0, idx).to(DEVICE)
 
-images_normalized = images_normalized.to(DEVICE)
-labels = labels.to(DEVICE)
+mean = torch.tensor(IMAGENET_MEAN, device=DEVICE)
+std = torch.tensor(IMAGENET_STD, device=DEVICE)
+images_normalized = (images_display - mean[:, None, None]) / std[:, None, None]
+images_resized = F.interpolate(images_normalized, size=pretrained_imgSize, mode='bilinear', align_corners=False)
 
-with torch.no_grad():
-    with autocast():
-        outputs = model(images_normalized)
+with torch.inference_mode():
+    with torch.autocast(device_type='cuda', dtype=AMP_DTYPE):
+        outputs = model(images_resized)
         probabilities = torch.softmax(outputs, dim=1)
         predicted_prob, predicted_class = torch.max(probabilities, 1)
 